@@ -4,7 +4,6 @@ Example script demonstrating the usage of the CWR import module.
 """
 import os
 import sys
-import json
 from src.main import CWRImport
 
 
@@ -68,8 +67,7 @@ def main():
         
         # Save the result to a JSON file
         output_file = os.path.splitext(file_path)[0] + ".json"
-        with open(output_file, 'w') as f:
-            json.dump(result, f, indent=2)
+        cwr_import.write_json(result, output_file)
         
         print(f"\nFull result saved to: {output_file}")
     
@@ -1,8 +1,170 @@
 """
 CWR Parser - Main module for parsing CWR files.
 """
-from typing import Dict, List, Optional, TextIO, Union, Any
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, TextIO, BinaryIO, Union, Any, Iterator, Tuple
+import mmap
 import os
+import re
+import stat
+import struct
+import sys
+
+
+# Record types that open a new transaction
+TRANSACTION_HEADERS = frozenset({'WRK', 'REV', 'ACK', 'ISW', 'ISR', 'EXC', 'NWR'})
+
+# Matches the start of every transaction header line in a buffer
+_TRANSACTION_START = re.compile(
+    b'^(?:' + b'|'.join(sorted(header.encode('ascii') for header in TRANSACTION_HEADERS)) + b')',
+    re.MULTILINE,
+)
+
+# Interned instances of the known record types, shared by every record of that type
+_RECORD_TYPES = {record_type: sys.intern(record_type) for record_type in (
+    'HDR', 'GRH', 'GRT', 'TRL', 'AGR', 'TER', 'IPA', 'WRK', 'NWR', 'REV', 'ISW', 'ISR',
+    'EXC', 'ACK', 'SPU', 'NPN', 'SPT', 'SWR', 'NWN', 'SWT', 'PWR', 'ALT', 'NAT', 'EWT',
+    'NET', 'NCT', 'NVT', 'VER', 'PER', 'NPR', 'REC', 'ORN', 'INS', 'IND', 'COM', 'ARI',
+    'XRF', 'MSG',
+)}
+
+# Files with fewer lines than this are always parsed in the calling process
+MIN_PARALLEL_LINES = 1000
+
+# Fixed-width field layouts of the control records, starting with the record type
+_HEADER_LAYOUT = struct.Struct('3s4s2s5s45s8s8s')
+_GROUP_HEADER_LAYOUT = struct.Struct('3s3s5s4s1s')
+_TRAILER_LAYOUT = struct.Struct('3s5s5s8s')
+
+
+def _layout_slices(layout: struct.Struct) -> List[Tuple[int, int]]:
+    """Get the (start, stop) positions of the fields of a fixed-width layout."""
+    slices = []
+    start = 0
+    for width in re.findall(r'(\d+)s', layout.format):
+        slices.append((start, start + int(width)))
+        start += int(width)
+    return slices
+
+
+# The same layouts as character slices, for lines read from text streams
+_LAYOUT_SLICES = {layout: _layout_slices(layout)
+                  for layout in (_HEADER_LAYOUT, _GROUP_HEADER_LAYOUT, _TRAILER_LAYOUT)}
+
+
+@dataclass(slots=True)
+class Record:
+    """
+    A CWR record that has not been broken down into its individual fields.
+    
+    Fields can also be read by name with record['record_type'] or
+    record.get('raw_data'), as with the dictionaries records used to be.
+    """
+    record_type: str
+    raw_data: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a dictionary."""
+        return {
+            'record_type': self.record_type,
+            'raw_data': self.raw_data
+        }
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in _RECORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key: object) -> bool:
+        return key in _RECORD_FIELDS
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a field by name, or default if the record has no such field."""
+        return getattr(self, key) if key in _RECORD_FIELDS else default
+
+
+_RECORD_FIELDS = frozenset(Record.__match_args__)
+
+
+def _unpack(layout: struct.Struct, line: Union[str, bytes]) -> Tuple[Union[str, bytes], ...]:
+    """Unpack the fixed-width fields of a line, padding short lines with spaces."""
+    if len(line) < layout.size:
+        line = line.ljust(layout.size)
+    if isinstance(line, str):
+        return tuple(line[start:stop] for start, stop in _LAYOUT_SLICES[layout])
+    return layout.unpack_from(line)
+
+
+def _decode(field: Union[str, bytes]) -> str:
+    """Decode a field of a latin-1 encoded line; fields of text lines are already strings."""
+    return field if isinstance(field, str) else field.decode('latin-1')
+
+
+def _fixed_int(field: Union[str, bytes]) -> int:
+    """Parse a space-padded fixed-width numeric field, treating a blank field as 0."""
+    if not field or field.isspace():
+        return 0
+    return int(field)
+
+
+def _iter_lines(buffer, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """Yield the lines of a bytes-like buffer without their line terminators."""
+    find = buffer.find
+    if end is None:
+        end = len(buffer)
+    
+    while start < end:
+        newline = find(b'\n', start, end)
+        if newline < 0:
+            newline = end
+        stop = newline
+        if stop > start and buffer[stop - 1:stop] == b'\r':
+            stop -= 1
+        yield buffer[start:stop]
+        start = newline + 1
+
+
+def _iter_file_lines(file: Union[TextIO, BinaryIO]) -> Iterator[Union[str, bytes]]:
+    """Yield the lines of a text or binary file object without their line terminators."""
+    for line in file:
+        if isinstance(line, str):
+            yield line.rstrip('\r\n')
+        else:
+            yield line.rstrip(b'\r\n')
+
+
+def _has_lines(buffer, count: int) -> bool:
+    """Check whether a bytes-like buffer has at least count newlines, stopping once they are found."""
+    find = buffer.find
+    position = 0
+    for _ in range(count):
+        position = find(b'\n', position) + 1
+        if not position:
+            return False
+    return True
+
+
+def _split_transactions(buffer, start: int, end: int, chunks: int) -> List[Tuple[int, int]]:
+    """Split a range of a buffer into about equal (start, end) ranges that break at transaction headers."""
+    size = max(1, -(-(end - start) // chunks))
+    ranges = []
+    
+    while start < end:
+        match = _TRANSACTION_START.search(buffer, min(start + size, end), end)
+        stop = match.start() if match else end
+        ranges.append((start, stop))
+        start = stop
+    
+    return ranges
+
+
+def _parse_transaction_chunk(chunk: bytes) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Parse a chunk of CWR records into transactions in a worker process."""
+    parser = CWRParser()
+    parse_record = parser._parse_record
+    transactions = parser._organize_transactions([parse_record(line) for line in _iter_lines(chunk)])
+    return transactions, parser.errors
 
 
 class CWRParser:
@@ -13,18 +175,19 @@ class CWRParser:
     the CISAC specifications.
     """
     
-    def __init__(self, version: Optional[str] = None):
+    def __init__(self, version: Optional[str] = None, workers: Optional[int] = None):
         """
         Initialize the CWR parser.
         
         Args:
             version: CWR version to use (e.g., '2.1', '2.2'). If None, version will be detected from the file.
+            workers: Number of processes used to parse the records of large files. If None or 1,
+                     records are parsed in the calling process.
         """
         self.version = version
+        self.workers = workers
         self.errors = []
         self.warnings = []
-        self.records = []
-        self.transactions = []
         
     def parse_file(self, file_path: str) -> Dict[str, Any]:
         """
@@ -40,18 +203,62 @@ class CWRParser:
             FileNotFoundError: If the file does not exist
             ValueError: If the file is not a valid CWR file
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        with open(file_path, 'r', encoding='latin-1') as file:
-            return self.parse(file)
+        with open(file_path, 'rb') as file:
+            file_stat = os.fstat(file.fileno())
+            
+            # Pipes, FIFOs and other special files cannot be memory-mapped
+            if not stat.S_ISREG(file_stat.st_mode):
+                return self.parse(file)
+            
+            # Empty files cannot be memory-mapped either
+            if file_stat.st_size == 0:
+                raise ValueError("Invalid CWR file: File too short")
+            
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return self.parse_buffer(buffer)
     
-    def parse(self, file: TextIO) -> Dict[str, Any]:
+    def parse(self, file: Union[TextIO, BinaryIO]) -> Dict[str, Any]:
         """
         Parse a CWR file from a file-like object.
         
         Args:
-            file: File-like object containing CWR data
+            file: File-like object containing CWR data, opened in text or binary mode
+            
+        Returns:
+            Dict containing the parsed CWR data
+            
+        Raises:
+            ValueError: If the file is not a valid CWR file
+        """
+        return self._parse_lines(_iter_file_lines(file))
+    
+    def parse_buffer(self, buffer: Union[bytes, mmap.mmap]) -> Dict[str, Any]:
+        """
+        Parse a CWR file held in a single latin-1 encoded buffer.
+        
+        Args:
+            buffer: Raw CWR file contents, either as bytes or a memory-mapped file
+            
+        Returns:
+            Dict containing the parsed CWR data
+            
+        Raises:
+            ValueError: If the file is not a valid CWR file
+        """
+        parallel = self.workers and self.workers > 1 and _has_lines(buffer, MIN_PARALLEL_LINES)
+        
+        # Walk the buffer line by line; a line is only copied out when reached
+        return self._parse_lines(_iter_lines(buffer), buffer if parallel else None)
+    
+    def _parse_lines(self, lines: Iterator[Union[str, bytes]],
+                     parallel_buffer: Optional[Union[bytes, mmap.mmap]] = None) -> Dict[str, Any]:
+        """
+        Parse a CWR file from its lines in a single pass.
+        
+        Args:
+            lines: Iterator over the lines of the file, without line terminators
+            parallel_buffer: Buffer holding the whole file, if its records should be
+                             parsed in worker processes
             
         Returns:
             Dict containing the parsed CWR data
@@ -61,112 +268,144 @@ class CWRParser:
         """
         self.errors = []
         self.warnings = []
-        self.records = []
-        self.transactions = []
         
-        # Read the file
-        lines = file.readlines()
+        header_line = next(lines, None)
+        group_header_line = next(lines, None)
+        previous_line = next(lines, None)
         
         # Validate header
-        if not lines or len(lines) < 3:
+        if previous_line is None:
             raise ValueError("Invalid CWR file: File too short")
         
         # Parse header record
-        header = self._parse_header(lines[0])
+        header = self._parse_header(header_line)
         
         # Parse group header
-        group_header = self._parse_group_header(lines[1])
+        group_header = self._parse_group_header(group_header_line)
         
-        # Parse records
-        for i in range(2, len(lines) - 1):
-            record = self._parse_record(lines[i])
-            self.records.append(record)
+        if parallel_buffer is not None:
+            transactions, previous_line = self._parse_transactions_parallel(parallel_buffer)
+        else:
+            # Parse records, holding back one line so the last one is parsed as the trailer
+            parse_record = self._parse_record
+            records = []
+            for line in lines:
+                records.append(parse_record(previous_line))
+                previous_line = line
+            
+            # Organize into transactions
+            transactions = self._organize_transactions(records)
         
         # Parse trailer
-        trailer = self._parse_trailer(lines[-1])
-        
-        # Organize into transactions
-        self._organize_transactions()
+        trailer = self._parse_trailer(previous_line)
         
         # Return the parsed data
         return {
             'header': header,
             'group_header': group_header,
-            'transactions': self.transactions,
+            'transactions': transactions,
             'trailer': trailer,
             'errors': self.errors,
             'warnings': self.warnings
         }
     
-    def _parse_header(self, line: str) -> Dict[str, Any]:
+    def _parse_transactions_parallel(self, buffer: Union[bytes, mmap.mmap]) -> Tuple[List[Dict[str, Any]], bytes]:
+        """
+        Parse the transactions between the group header and the trailer in worker processes.
+        
+        The records are split into chunks at transaction headers, so each worker
+        organizes its own chunk and the results only need to be concatenated.
+        Returns the transactions and the trailer line.
+        """
+        end = len(buffer)
+        
+        # Records start after the first two lines and stop at the last line, the trailer
+        records_start = buffer.find(b'\n', buffer.find(b'\n') + 1) + 1
+        trailer_end = end - 1 if buffer[end - 1:end] == b'\n' else end
+        records_end = buffer.rfind(b'\n', 0, trailer_end) + 1
+        trailer_line = next(_iter_lines(buffer, records_end, end), b'')
+        
+        transactions = []
+        ranges = _split_transactions(buffer, records_start, records_end, self.workers)
+        chunks = (buffer[start:stop] for start, stop in ranges)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for chunk_transactions, chunk_errors in executor.map(_parse_transaction_chunk, chunks):
+                transactions.extend(chunk_transactions)
+                self.errors.extend(chunk_errors)
+        
+        return transactions, trailer_line
+    
+    def _parse_header(self, line: Union[str, bytes]) -> Dict[str, Any]:
         """Parse the HDR (header) record from a CWR file."""
-        if not line.startswith('HDR'):
+        (record_type, version, sender_type, sender_id, sender_name,
+         creation_date, transmission_date) = _unpack(_HEADER_LAYOUT, line)
+        if record_type not in ('HDR', b'HDR'):
             raise ValueError("Invalid CWR file: File does not start with HDR record")
         
         # In a real implementation, this would extract all fields according to their positions
         # For now, we'll just return a basic structure
         return {
             'record_type': 'HDR',
-            'version': line[3:7].strip(),
-            'sender_type': line[7:9].strip(),
-            'sender_id': line[9:14].strip(),
-            'sender_name': line[14:59].strip(),
-            'creation_date': line[59:67].strip(),
-            'transmission_date': line[67:75].strip(),
+            'version': _decode(version).strip(),
+            'sender_type': _decode(sender_type).strip(),
+            'sender_id': _decode(sender_id).strip(),
+            'sender_name': _decode(sender_name).strip(),
+            'creation_date': _decode(creation_date).strip(),
+            'transmission_date': _decode(transmission_date).strip(),
         }
     
-    def _parse_group_header(self, line: str) -> Dict[str, Any]:
+    def _parse_group_header(self, line: Union[str, bytes]) -> Dict[str, Any]:
         """Parse the GRH (group header) record from a CWR file."""
-        if not line.startswith('GRH'):
+        record_type, transaction_type, group_id, version, batch_request = _unpack(_GROUP_HEADER_LAYOUT, line)
+        if record_type not in ('GRH', b'GRH'):
             raise ValueError("Invalid CWR file: Second line does not contain GRH record")
         
         # Basic extraction for now
         return {
             'record_type': 'GRH',
-            'transaction_type': line[3:6].strip(),
-            'group_id': line[6:11].strip(),
-            'version': line[11:15].strip(),
-            'batch_request': line[15].strip(),
+            'transaction_type': _decode(transaction_type).strip(),
+            'group_id': _decode(group_id).strip(),
+            'version': _decode(version).strip(),
+            'batch_request': _decode(batch_request).strip(),
         }
     
-    def _parse_record(self, line: str) -> Dict[str, Any]:
+    def _parse_record(self, line: Union[str, bytes]) -> Record:
         """Parse a record from a CWR file."""
-        if not line or len(line) < 3:
-            return {'record_type': 'UNKNOWN', 'raw_data': line}
-        
-        record_type = line[0:3]
+        raw_data = _decode(line)
+        if len(line) < 3:
+            return Record('UNKNOWN', raw_data)
         
         # In a real implementation, we would have specific parsers for each record type
         # For now, just return the record type and raw data
-        return {
-            'record_type': record_type,
-            'raw_data': line
-        }
+        record_type = raw_data[0:3]
+        return Record(_RECORD_TYPES.get(record_type, record_type), raw_data)
     
-    def _parse_trailer(self, line: str) -> Dict[str, Any]:
+    def _parse_trailer(self, line: Union[str, bytes]) -> Dict[str, Any]:
         """Parse the TRL (trailer) record from a CWR file."""
-        if not line.startswith('TRL'):
+        record_type, group_count, transaction_count, record_count = _unpack(_TRAILER_LAYOUT, line)
+        if record_type not in ('TRL', b'TRL'):
             raise ValueError("Invalid CWR file: Last line does not contain TRL record")
         
         # Basic extraction for now
         return {
             'record_type': 'TRL',
-            'group_count': int(line[3:8].strip() or '0'),
-            'transaction_count': int(line[8:13].strip() or '0'),
-            'record_count': int(line[13:21].strip() or '0'),
+            'group_count': _fixed_int(group_count),
+            'transaction_count': _fixed_int(transaction_count),
+            'record_count': _fixed_int(record_count),
         }
     
-    def _organize_transactions(self):
+    def _organize_transactions(self, records: List[Record]) -> List[Dict[str, Any]]:
         """Organize parsed records into transactions."""
+        transactions = []
         current_transaction = None
         
-        for record in self.records:
-            record_type = record['record_type']
+        for record in records:
+            record_type = record.record_type
             
             # Transaction headers
-            if record_type in ('WRK', 'REV', 'ACK', 'ISW', 'ISR', 'EXC', 'NWR'):
+            if record_type in TRANSACTION_HEADERS:
                 if current_transaction:
-                    self.transactions.append(current_transaction)
+                    transactions.append(current_transaction)
                 current_transaction = {
                     'transaction_type': record_type,
                     'records': [record]
@@ -179,4 +418,6 @@ class CWRParser:
         
         # Add the last transaction if there is one
         if current_transaction:
-            self.transactions.append(current_transaction) 
\ No newline at end of file
+            transactions.append(current_transaction)
+        
+        return transactions
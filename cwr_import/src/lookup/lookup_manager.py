@@ -3,7 +3,55 @@ CWR Lookup Manager - Manages lookup tables for CWR data validation.
 """
 import os
 import csv
-from typing import Dict, List, Any, Optional
+import pickle
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+
+def _get_field(row: Sequence[str], index: Optional[int]) -> str:
+    """Get a field from a CSV row by position, or '' if the row has no such field."""
+    if index is None or index >= len(row):
+        return ''
+    return row[index]
+
+
+def _column_index(columns: Sequence[str], name: str) -> Optional[int]:
+    """Get the position of a named column, or None if the column is missing."""
+    try:
+        return columns.index(name)
+    except ValueError:
+        return None
+
+
+class LookupTable(Sequence):
+    """
+    Rows of a lookup table.
+    
+    Rows are stored as tuples in column order; indexing the table returns
+    a row as a dictionary keyed by column name.
+    """
+    
+    def __init__(self, columns: Sequence[str], rows: List[Tuple[str, ...]]):
+        """
+        Initialize the lookup table.
+        
+        Args:
+            columns: Names of the table columns
+            rows: Table rows as tuples of field values in column order
+        """
+        self.columns = tuple(columns)
+        self.rows = rows
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row_to_dict(row) for row in self.rows[index]]
+        return self.row_to_dict(self.rows[index])
+    
+    def row_to_dict(self, row: Tuple[str, ...]) -> Dict[str, str]:
+        """Convert a row tuple to a dictionary keyed by column name."""
+        return dict(zip(self.columns, row))
 
 
 class LookupManager:
@@ -29,20 +77,24 @@ class LookupManager:
             tables_dir = os.path.join(current_dir, 'tables')
         
         self.tables_dir = tables_dir
-        self.tables: Dict[str, List[Dict[str, str]]] = {}
+        self.tables: Dict[str, LookupTable] = {}
+        self._indices: Dict[Tuple[str, str], Dict[str, Tuple[str, ...]]] = {}
         
         # Ensure the tables directory exists
         os.makedirs(tables_dir, exist_ok=True)
         
-    def load_table(self, table_name: str) -> List[Dict[str, str]]:
+    def load_table(self, table_name: str) -> LookupTable:
         """
         Load a lookup table from a CSV file.
         
+        The parsed table is pickled next to the CSV file and reused on later
+        runs for as long as the CSV file is not modified.
+        
         Args:
             table_name: Name of the table to load (without the .csv extension)
             
         Returns:
-            List of dictionaries containing the table data
+            The table data, a sequence of dictionaries keyed by column name
             
         Raises:
             FileNotFoundError: If the table file does not exist
@@ -51,24 +103,68 @@ class LookupManager:
         if table_name in self.tables:
             return self.tables[table_name]
         
-        # Construct the file path
+        # Construct the file paths
         file_path = os.path.join(self.tables_dir, f"{table_name}.csv")
+        cache_path = os.path.join(self.tables_dir, f"{table_name}.pkl")
         
         # Check if the file exists
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Lookup table not found: {file_path}")
         
-        # Load the table from the CSV file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f, delimiter=';')
-            table_data = [row for row in reader]
+        # Reuse the pickled table if it is up to date
+        table_data = self._load_cached_table(file_path, cache_path)
+        
+        if table_data is None:
+            # Load the table from the CSV file
+            with open(file_path, 'r', encoding='utf-8') as f:
+                reader = csv.reader(f, delimiter=';')
+                columns = next(reader, [])
+                # Skip blank lines, as csv.DictReader does
+                table_data = LookupTable(columns, [tuple(row) for row in reader if row])
+            
+            self._save_cached_table(cache_path, table_data)
         
         # Store the table in memory
         self.tables[table_name] = table_data
         
         return table_data
     
-    def get_table(self, table_name: str) -> List[Dict[str, str]]:
+    @staticmethod
+    def _load_cached_table(file_path: str, cache_path: str) -> Optional[LookupTable]:
+        """Load a pickled table, or return None if it is missing, unreadable or older than its CSV file."""
+        try:
+            if os.path.getmtime(cache_path) < os.path.getmtime(file_path):
+                return None
+            
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            # Any corrupt or foreign cache file is treated as a cache miss
+            return None
+        
+        # The cache holds only builtins, (columns, rows), so it loads the same
+        # whichever path this module was imported under
+        if not (isinstance(cached, tuple) and len(cached) == 2
+                and isinstance(cached[0], tuple) and isinstance(cached[1], list)):
+            return None
+        
+        columns, rows = cached
+        return LookupTable(columns, rows)
+    
+    @staticmethod
+    def _save_cached_table(cache_path: str, table_data: LookupTable) -> None:
+        """Pickle a parsed table next to its CSV file, ignoring unwritable directories."""
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump((table_data.columns, table_data.rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def get_table(self, table_name: str) -> LookupTable:
         """
         Get a lookup table.
         
@@ -76,7 +172,7 @@ class LookupManager:
             table_name: Name of the table to get
             
         Returns:
-            List of dictionaries containing the table data
+            The table data, a sequence of dictionaries keyed by column name
             
         Raises:
             FileNotFoundError: If the table file does not exist
@@ -100,16 +196,17 @@ class LookupManager:
         Raises:
             FileNotFoundError: If the table file does not exist
         """
-        table = self.get_table(table_name)
+        row = self._get_index(table_name, key_field).get(key_value)
         
-        # Look for the row with the matching key
-        for row in table:
-            if row.get(key_field) == key_value:
-                if value_field:
-                    return row.get(value_field)
-                return row
+        if row is None:
+            return None
         
-        return None
+        table = self.get_table(table_name)
+        if value_field:
+            value_index = _column_index(table.columns, value_field)
+            return row[value_index] if value_index is not None and value_index < len(row) else None
+        
+        return table.row_to_dict(row)
     
     def is_valid(self, table_name: str, key_field: str, key_value: str) -> bool:
         """
@@ -126,8 +223,26 @@ class LookupManager:
         Raises:
             FileNotFoundError: If the table file does not exist
         """
-        result = self.lookup(table_name, key_field, key_value)
-        return result is not None
+        return key_value in self._get_index(table_name, key_field)
+    
+    def _get_index(self, table_name: str, key_field: str) -> Dict[str, Tuple[str, ...]]:
+        """Get the rows of a table keyed by one of its fields, building the index on first use."""
+        index_key = (table_name, key_field)
+        index = self._indices.get(index_key)
+        
+        if index is None:
+            index = {}
+            table = self.get_table(table_name)
+            key_index = _column_index(table.columns, key_field)
+            
+            if key_index is not None:
+                for row in table.rows:
+                    # Keep the first matching row, as a linear scan would
+                    if key_index < len(row):
+                        index.setdefault(row[key_index], row)
+            self._indices[index_key] = index
+        
+        return index
     
     def extract_lookup_table(self, csv_file: str, table_name: str,
                              code_column: str = 'CODE', 
@@ -147,37 +262,8 @@ class LookupManager:
         if not os.path.exists(csv_file):
             raise FileNotFoundError(f"CSV file not found: {csv_file}")
         
-        # Read the CSV file
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f, delimiter=';')
-            rows = [row for row in reader]
-        
-        # Extract the rows for the specified table
-        table_rows = []
-        current_table = None
-        
-        for row in rows:
-            table_field = row.get('TABLE_NAME', '')
-            
-            # Check if this is a new table
-            if table_field and not table_field.isspace():
-                current_table = table_field
-            
-            # If this row belongs to the table we're looking for, add it
-            if current_table == table_name and row.get(code_column) and row.get(definition_column):
-                table_rows.append({
-                    'CODE': row.get(code_column, ''),
-                    'DEFINITION': row.get(definition_column, '')
-                })
-        
-        # Create the output CSV file
-        output_file = os.path.join(self.tables_dir, f"{table_name}.csv")
-        
-        with open(output_file, 'w', encoding='utf-8', newline='') as f:
-            fieldnames = ['CODE', 'DEFINITION']
-            writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=';')
-            writer.writeheader()
-            writer.writerows(table_rows)
+        tables = self._read_lookup_tables(csv_file, code_column, definition_column)
+        self._write_lookup_table(table_name, tables.get(table_name, []))
     
     def extract_all_lookup_tables(self, csv_file: str) -> List[str]:
         """
@@ -195,23 +281,54 @@ class LookupManager:
         if not os.path.exists(csv_file):
             raise FileNotFoundError(f"CSV file not found: {csv_file}")
         
-        # Read the CSV file
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f, delimiter=';')
-            rows = [row for row in reader]
+        # Group the rows of every table in a single pass over the file
+        tables = self._read_lookup_tables(csv_file)
+        
+        # Write each table
+        for table_name, table_rows in tables.items():
+            self._write_lookup_table(table_name, table_rows)
         
-        # Find all table names
-        table_names = set()
+        return list(tables)
+    
+    @staticmethod
+    def _read_lookup_tables(csv_file: str, code_column: str = 'CODE',
+                            definition_column: str = 'DEFINITION') -> Dict[str, List[Tuple[str, str]]]:
+        """Read the (code, definition) rows of every table in a CSV file, keyed by table name."""
+        tables: Dict[str, List[Tuple[str, str]]] = {}
+        table_rows = None
         
-        for row in rows:
-            table_field = row.get('TABLE_NAME', '')
+        with open(csv_file, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f, delimiter=';')
+            header = next(reader, [])
+            table_index = _column_index(header, 'TABLE_NAME')
+            code_index = _column_index(header, code_column)
+            definition_index = _column_index(header, definition_column)
             
-            # Check if this is a valid table name
-            if table_field and not table_field.isspace():
-                table_names.add(table_field)
+            for row in reader:
+                table_field = _get_field(row, table_index)
+                
+                # Check if this is a new table
+                if table_field and not table_field.isspace():
+                    table_rows = tables.setdefault(table_field, [])
+                
+                # Add the row to the current table
+                code = _get_field(row, code_index)
+                definition = _get_field(row, definition_index)
+                if table_rows is not None and code and definition:
+                    table_rows.append((code, definition))
+        
+        return tables
+    
+    def _write_lookup_table(self, table_name: str, table_rows: List[Tuple[str, str]]) -> None:
+        """Save the rows of a table as a separate CSV file in the tables directory."""
+        output_file = os.path.join(self.tables_dir, f"{table_name}.csv")
         
-        # Extract each table
-        for table_name in table_names:
-            self.extract_lookup_table(csv_file, table_name)
+        with open(output_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(['CODE', 'DEFINITION'])
+            writer.writerows(table_rows)
         
-        return list(table_names) 
\ No newline at end of file
+        # Drop any pickled copy of the previous table contents
+        cache_file = os.path.join(self.tables_dir, f"{table_name}.pkl")
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
@@ -1,7 +1,6 @@
 """
 CWR Import Module - Main entry point for the CWR parser.
 """
-import os
 import sys
 import json
 import argparse
@@ -11,6 +10,27 @@ from .cwr_parser import CWRParser
 from .validator.validator import CWRValidator
 from .models.records import CWRFile
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert parsed record objects to JSON-serializable dictionaries."""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dump_json(data: Any, indent: bool = True) -> bytes:
+    """Serialize data to UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(data, indent=2, default=_json_default).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), default=_json_default).encode('utf-8')
+
 
 class CWRImport:
     """
@@ -46,9 +66,6 @@ class CWRImport:
             FileNotFoundError: If the file does not exist
             ValueError: If the file is not a valid CWR file
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
         # Parse the file
         result = self.parser.parse_file(file_path)
         
@@ -56,8 +73,8 @@ class CWRImport:
         if validate:
             is_valid = self.validator.validate(result)
             result['is_valid'] = is_valid
-            result['validation_errors'] = self.validator.errors
-            result['validation_warnings'] = self.validator.warnings
+            result['validation_errors'] = self.validator.format_errors()
+            result['validation_warnings'] = self.validator.warnings_list
         
         return result
     
@@ -82,8 +99,8 @@ class CWRImport:
         if validate:
             is_valid = self.validator.validate(result)
             result['is_valid'] = is_valid
-            result['validation_errors'] = self.validator.errors
-            result['validation_warnings'] = self.validator.warnings
+            result['validation_errors'] = self.validator.format_errors()
+            result['validation_warnings'] = self.validator.warnings_list
         
         return result
     
@@ -99,14 +116,44 @@ class CWRImport:
         Returns:
             JSON string if output_file is None, otherwise None
         """
-        json_data = json.dumps(cwr_data, indent=2)
+        json_data = _dump_json(cwr_data)
         
         if output_file:
-            with open(output_file, 'w') as f:
+            with open(output_file, 'wb') as f:
                 f.write(json_data)
             return None
         
-        return json_data
+        return json_data.decode('utf-8')
+    
+    @staticmethod
+    def write_json(cwr_data: Dict[str, Any], output_file: str) -> None:
+        """
+        Write CWR data to a JSON file one transaction at a time.
+        
+        Unlike to_json, the whole JSON document is never held in memory:
+        each top-level value and each transaction is serialized separately
+        and written on its own line.
+        
+        Args:
+            cwr_data: Parsed CWR data
+            output_file: File path to write the JSON to
+        """
+        with open(output_file, 'wb') as f:
+            f.write(b'{')
+            
+            for i, (key, value) in enumerate(cwr_data.items()):
+                f.write(b',\n  ' if i else b'\n  ')
+                f.write(_dump_json(key, indent=False) + b': ')
+                
+                if key == 'transactions' and value:
+                    for j, transaction in enumerate(value):
+                        f.write(b',\n    ' if j else b'[\n    ')
+                        f.write(_dump_json(transaction, indent=False))
+                    f.write(b'\n  ]')
+                else:
+                    f.write(_dump_json(value, indent=False))
+            
+            f.write(b'\n}\n')
 
 
 def main():
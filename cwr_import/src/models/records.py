@@ -1,26 +1,41 @@
 """
 CWR Record Models - Defines data models for CWR record types.
 """
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field, fields
+from typing import List, Optional, Dict, Any, Iterator, TextIO
 import datetime
+import json
 
 
-@dataclass
+def _record_dataclass(cls):
+    """
+    Make a record class a slotted dataclass with a generated to_dict().
+    
+    Like the __init__ that dataclasses generates, to_dict() is compiled from
+    source once per class, so it builds the dictionary from a single literal
+    with one entry per field.
+    """
+    cls = dataclass(slots=True)(cls)
+    
+    items = ', '.join(f"{f.name!r}: self.{f.name}" for f in fields(cls))
+    namespace: Dict[str, Any] = {}
+    exec(f"def to_dict(self):\n    return {{{items}}}\n", {}, namespace)
+    
+    to_dict = namespace['to_dict']
+    to_dict.__qualname__ = f"{cls.__qualname__}.to_dict"
+    to_dict.__doc__ = "Convert the record to a dictionary."
+    cls.to_dict = to_dict
+    return cls
+
+
+@_record_dataclass
 class BaseRecord:
     """Base class for all CWR record types."""
     record_type: str
     record_sequence: int = 0
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        return {
-            'record_type': self.record_type,
-            'record_sequence': self.record_sequence
-        }
 
 
-@dataclass
+@_record_dataclass
 class HeaderRecord(BaseRecord):
     """HDR (Header) record for CWR files."""
     record_type: str = 'HDR'
@@ -32,24 +47,9 @@ class HeaderRecord(BaseRecord):
     creation_time: str = ''  # HHMMSS
     transmission_date: str = ''  # YYYYMMDD
     character_set: str = 'ASCII'
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'sender_type': self.sender_type,
-            'sender_id': self.sender_id,
-            'sender_name': self.sender_name,
-            'edi_standard': self.edi_standard,
-            'creation_date': self.creation_date,
-            'creation_time': self.creation_time,
-            'transmission_date': self.transmission_date,
-            'character_set': self.character_set
-        })
-        return data
-
-
-@dataclass
+
+
+@_record_dataclass
 class GroupHeaderRecord(BaseRecord):
     """GRH (Group Header) record for CWR files."""
     record_type: str = 'GRH'
@@ -57,58 +57,27 @@ class GroupHeaderRecord(BaseRecord):
     group_id: str = ''
     version_number: str = ''
     batch_request_id: str = ''
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'transaction_type': self.transaction_type,
-            'group_id': self.group_id,
-            'version_number': self.version_number,
-            'batch_request_id': self.batch_request_id
-        })
-        return data
 
 
-@dataclass
+@_record_dataclass
 class GroupTrailerRecord(BaseRecord):
     """GRT (Group Trailer) record for CWR files."""
     record_type: str = 'GRT'
     group_id: str = ''
     transaction_count: int = 0
     record_count: int = 0
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'group_id': self.group_id,
-            'transaction_count': self.transaction_count,
-            'record_count': self.record_count
-        })
-        return data
 
 
-@dataclass
+@_record_dataclass
 class TrailerRecord(BaseRecord):
     """TRL (Trailer) record for CWR files."""
     record_type: str = 'TRL'
     group_count: int = 0
     transaction_count: int = 0
     record_count: int = 0
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'group_count': self.group_count,
-            'transaction_count': self.transaction_count,
-            'record_count': self.record_count
-        })
-        return data
 
 
-@dataclass
+@_record_dataclass
 class WorkRegistrationRecord(BaseRecord):
     """WRK (Work Registration) transaction header record."""
     record_type: str = 'WRK'
@@ -121,24 +90,9 @@ class WorkRegistrationRecord(BaseRecord):
     duration: Optional[int] = None  # Duration in seconds
     catalogue_number: str = ''
     opus_number: str = ''
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'transaction_sequence': self.transaction_sequence,
-            'submitter_work_number': self.submitter_work_number,
-            'title': self.title,
-            'language_code': self.language_code,
-            'work_type_code': self.work_type_code,
-            'duration': self.duration,
-            'catalogue_number': self.catalogue_number,
-            'opus_number': self.opus_number
-        })
-        return data
-
-
-@dataclass
+
+
+@_record_dataclass
 class AlternativeTitleRecord(BaseRecord):
     """ALT (Alternative Title) record."""
     record_type: str = 'ALT'
@@ -147,20 +101,9 @@ class AlternativeTitleRecord(BaseRecord):
     title: str = ''
     title_type: str = ''  # OT (Original), AT (Alternative), etc.
     language_code: str = ''
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'transaction_sequence': self.transaction_sequence,
-            'title': self.title,
-            'title_type': self.title_type,
-            'language_code': self.language_code
-        })
-        return data
 
 
-@dataclass
+@_record_dataclass
 class SubmitterWriterRecord(BaseRecord):
     """SWR (Submitter Writer) record."""
     record_type: str = 'SWR'
@@ -175,26 +118,9 @@ class SubmitterWriterRecord(BaseRecord):
     pr_ownership_share: float = 0.0  # Percentage (0-100)
     mr_ownership_share: float = 0.0  # Percentage (0-100)
     sr_ownership_share: float = 0.0  # Percentage (0-100)
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'transaction_sequence': self.transaction_sequence,
-            'interested_party_number': self.interested_party_number,
-            'writer_id': self.writer_id,
-            'last_name': self.last_name,
-            'first_name': self.first_name,
-            'writer_unknown': self.writer_unknown,
-            'writer_role': self.writer_role,
-            'pr_ownership_share': self.pr_ownership_share,
-            'mr_ownership_share': self.mr_ownership_share,
-            'sr_ownership_share': self.sr_ownership_share
-        })
-        return data
-
-
-@dataclass
+
+
+@_record_dataclass
 class WriterTerritoryRecord(BaseRecord):
     """SWT (Writer Territory) record."""
     record_type: str = 'SWT'
@@ -206,23 +132,9 @@ class WriterTerritoryRecord(BaseRecord):
     mr_collection_share: float = 0.0  # Percentage (0-100)
     sr_collection_share: float = 0.0  # Percentage (0-100)
     inclusion_exclusion_indicator: str = ''  # I (Include) or E (Exclude)
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'transaction_sequence': self.transaction_sequence,
-            'interested_party_number': self.interested_party_number,
-            'territory_code': self.territory_code,
-            'pr_collection_share': self.pr_collection_share,
-            'mr_collection_share': self.mr_collection_share,
-            'sr_collection_share': self.sr_collection_share,
-            'inclusion_exclusion_indicator': self.inclusion_exclusion_indicator
-        })
-        return data
 
 
-@dataclass
+@_record_dataclass
 class SubmitterPublisherRecord(BaseRecord):
     """SPU (Submitter Publisher) record."""
     record_type: str = 'SPU'
@@ -234,23 +146,9 @@ class SubmitterPublisherRecord(BaseRecord):
     publisher_type: str = ''  # E (Original), AM (Administrator), etc.
     publisher_unknown: bool = False
     publisher_role: str = ''
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'transaction_sequence': self.transaction_sequence,
-            'publisher_sequence': self.publisher_sequence,
-            'publisher_id': self.publisher_id,
-            'publisher_name': self.publisher_name,
-            'publisher_type': self.publisher_type,
-            'publisher_unknown': self.publisher_unknown,
-            'publisher_role': self.publisher_role
-        })
-        return data
 
 
-@dataclass
+@_record_dataclass
 class PublisherTerritoryRecord(BaseRecord):
     """SPT (Publisher Territory) record."""
     record_type: str = 'SPT'
@@ -262,23 +160,9 @@ class PublisherTerritoryRecord(BaseRecord):
     mr_collection_share: float = 0.0  # Percentage (0-100)
     sr_collection_share: float = 0.0  # Percentage (0-100)
     inclusion_exclusion_indicator: str = ''  # I (Include) or E (Exclude)
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'transaction_sequence': self.transaction_sequence,
-            'publisher_sequence': self.publisher_sequence,
-            'territory_code': self.territory_code,
-            'pr_collection_share': self.pr_collection_share,
-            'mr_collection_share': self.mr_collection_share,
-            'sr_collection_share': self.sr_collection_share,
-            'inclusion_exclusion_indicator': self.inclusion_exclusion_indicator
-        })
-        return data
 
 
-@dataclass
+@_record_dataclass
 class PerformingArtistRecord(BaseRecord):
     """PER (Performing Artist) record."""
     record_type: str = 'PER'
@@ -288,21 +172,9 @@ class PerformingArtistRecord(BaseRecord):
     performing_artist_first_name: str = ''
     performing_artist_ipi_name_number: str = ''
     performing_artist_ipi_base_number: str = ''
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'transaction_sequence': self.transaction_sequence,
-            'performing_artist_last_name': self.performing_artist_last_name,
-            'performing_artist_first_name': self.performing_artist_first_name,
-            'performing_artist_ipi_name_number': self.performing_artist_ipi_name_number,
-            'performing_artist_ipi_base_number': self.performing_artist_ipi_base_number
-        })
-        return data
 
 
-@dataclass
+@_record_dataclass
 class RecordingDetailRecord(BaseRecord):
     """REC (Recording Detail) record."""
     record_type: str = 'REC'
@@ -316,25 +188,9 @@ class RecordingDetailRecord(BaseRecord):
     recording_format: str = ''
     recording_duration: Optional[int] = None  # Duration in seconds
     release_date: Optional[str] = None  # YYYYMMDD
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'transaction_sequence': self.transaction_sequence,
-            'recording_title': self.recording_title,
-            'version_title': self.version_title,
-            'recording_label': self.recording_label,
-            'recording_id': self.recording_id,
-            'isrc': self.isrc,
-            'recording_format': self.recording_format,
-            'recording_duration': self.recording_duration,
-            'release_date': self.release_date
-        })
-        return data
-
-
-@dataclass
+
+
+@_record_dataclass
 class WorkOriginRecord(BaseRecord):
     """ORN (Work Origin) record."""
     record_type: str = 'ORN'
@@ -349,26 +205,9 @@ class WorkOriginRecord(BaseRecord):
     production_year: Optional[int] = None
     episode_title: str = ''
     episode_number: Optional[int] = None
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the record to a dictionary."""
-        data = super().to_dict()
-        data.update({
-            'transaction_sequence': self.transaction_sequence,
-            'intended_purpose': self.intended_purpose,
-            'production_title': self.production_title,
-            'cd_identifier': self.cd_identifier,
-            'cut_number': self.cut_number,
-            'library': self.library,
-            'bltvr': self.bltvr,
-            'production_year': self.production_year,
-            'episode_title': self.episode_title,
-            'episode_number': self.episode_number
-        })
-        return data
-
-
-@dataclass
+
+
+@dataclass(slots=True)
 class CWRTransaction:
     """Represents a CWR transaction (a group of related records)."""
     transaction_type: str
@@ -386,7 +225,7 @@ class CWRTransaction:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CWRFile:
     """Represents a complete CWR file."""
     header: HeaderRecord
@@ -396,11 +235,44 @@ class CWRFile:
     trailer: Optional[TrailerRecord] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert the CWR file to a dictionary."""
+        """
+        Convert the CWR file to a dictionary.
+        
+        Every transaction and record is converted up front, so the whole file
+        is held in memory as dictionaries. Use write_json() or
+        iter_transaction_dicts() for large files.
+        """
         return {
             'header': self.header.to_dict(),
             'group_header': self.group_header.to_dict(),
             'transactions': [transaction.to_dict() for transaction in self.transactions],
             'group_trailer': self.group_trailer.to_dict() if self.group_trailer else None,
             'trailer': self.trailer.to_dict() if self.trailer else None
-        } 
\ No newline at end of file
+        }
+    
+    def iter_transaction_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Yield each transaction as a dictionary, one at a time."""
+        for transaction in self.transactions:
+            yield transaction.to_dict()
+    
+    def write_json(self, fp: TextIO) -> None:
+        """
+        Write the CWR file to a text stream as JSON.
+        
+        The output matches json.dump(self.to_dict(), fp), but transactions are
+        converted and written one at a time instead of all at once.
+        """
+        fp.write('{"header": ')
+        json.dump(self.header.to_dict(), fp)
+        fp.write(', "group_header": ')
+        json.dump(self.group_header.to_dict(), fp)
+        fp.write(', "transactions": [')
+        for i, transaction_dict in enumerate(self.iter_transaction_dicts()):
+            if i:
+                fp.write(', ')
+            json.dump(transaction_dict, fp)
+        fp.write('], "group_trailer": ')
+        json.dump(self.group_trailer.to_dict() if self.group_trailer else None, fp)
+        fp.write(', "trailer": ')
+        json.dump(self.trailer.to_dict() if self.trailer else None, fp)
+        fp.write('}')
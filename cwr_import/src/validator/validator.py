@@ -1,10 +1,130 @@
 """
 CWR Validator - Validates CWR files according to specifications.
 """
-from typing import Dict, List, Any, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from functools import lru_cache
+from typing import Deque, Dict, List, Any, Optional, Tuple
 import re
 
 
+# Valid sender types in the HDR record
+_SENDER_TYPES = frozenset({'PB', 'SO', 'WR', 'AA'})
+
+# Valid transaction types in the GRH record
+_GRH_TX_TYPES = frozenset({'NWR', 'REV', 'ACK', 'ISW', 'ISR', 'EXC'})
+
+# Valid transaction header record types
+_TX_TYPES = frozenset({'WRK', 'REV', 'ACK', 'ISW', 'ISR', 'EXC', 'NWR'})
+
+# Transaction types that must contain SWR and SWT records
+_NWR_LIKE_TX_TYPES = frozenset({'NWR', 'REV'})
+
+# Version number expected in the HDR and GRH records for each CWR version
+_VERSION_MAP = {'2.1': '01.10', '2.2': '02.20'}
+
+# Stands in for a component that is missing from the parsed CWR data
+_MISSING = object()
+
+# Dates in YYYYMMDD format between 1900 and 2100
+_DATE_RE = re.compile(r'(?:19[0-9]{2}|20[0-9]{2}|2100)(?:0[1-9]|1[0-2])(?:0[1-9]|[12][0-9]|3[01])')
+
+
+class ErrorCode(IntEnum):
+    """Codes for the errors reported by CWRValidator."""
+    MISSING_HDR = 1
+    MISSING_GRH = 2
+    MISSING_TRL = 3
+    NO_TRANSACTIONS = 4
+    BAD_HDR = 5
+    BAD_VERSION = 6
+    BAD_SENDER = 7
+    BAD_CREATION_DATE = 8
+    BAD_TRANSMISSION_DATE = 9
+    BAD_GRH = 10
+    BAD_GRH_TX_TYPE = 11
+    BAD_GRH_VERSION = 12
+    BAD_TRANSACTION = 13
+    BAD_TX_TYPE = 14
+    EMPTY_TRANSACTION = 15
+    TX_HEADER_MISMATCH = 16
+    MISSING_SWT = 17
+    MISSING_SWR = 18
+    BAD_TRL = 19
+    TX_COUNT_MISMATCH = 20
+
+
+E = ErrorCode
+
+# Message template for each error code, filled in by CWRValidator.format_errors()
+_MSGS = {
+    E.MISSING_HDR: "Missing HDR record",
+    E.MISSING_GRH: "Missing GRH record",
+    E.MISSING_TRL: "Missing TRL record",
+    E.NO_TRANSACTIONS: "No transactions found in CWR file",
+    E.BAD_HDR: "Invalid or missing HDR record",
+    E.BAD_VERSION: "Invalid version for CWR {}: {}",
+    E.BAD_SENDER: "Invalid sender type: {}",
+    E.BAD_CREATION_DATE: "Invalid creation date: {}",
+    E.BAD_TRANSMISSION_DATE: "Invalid transmission date: {}",
+    E.BAD_GRH: "Invalid or missing GRH record",
+    E.BAD_GRH_TX_TYPE: "Invalid transaction type in GRH: {}",
+    E.BAD_GRH_VERSION: "Invalid version in GRH for CWR {}: {}",
+    E.BAD_TRANSACTION: "Invalid transaction at index {}",
+    E.BAD_TX_TYPE: "Invalid transaction type: {}",
+    E.EMPTY_TRANSACTION: "Transaction contains no records",
+    E.TX_HEADER_MISMATCH: "Transaction header record type does not match transaction type",
+    E.MISSING_SWT: "{} transaction missing SWT record",
+    E.MISSING_SWR: "{} transaction missing SWR record",
+    E.BAD_TRL: "Invalid or missing TRL record",
+    E.TX_COUNT_MISMATCH: "Transaction count mismatch: {} in TRL, {} actual",
+}
+
+
+def _present(component: Any, default: Any) -> Any:
+    """Get a component of the parsed CWR data, or default if it is missing or None."""
+    return default if component is _MISSING or component is None else component
+
+
+def _validate_date(date_str: str) -> bool:
+    """Validate a date string in YYYYMMDD format."""
+    return bool(date_str) and _DATE_RE.fullmatch(date_str) is not None
+
+
+@lru_cache(maxsize=256)
+def _header_decision(cwr_version: str, version: str, sender_type: str,
+                     creation_date: str, transmission_date: str) -> Tuple[bool, Tuple[Tuple[Any, ...], ...]]:
+    """
+    Check the HDR fields that determine its validity.
+    
+    The result depends only on the arguments, so it is cached: files from the
+    same sender usually share a header and are only checked once.
+    
+    Returns:
+        Tuple of (valid, errors), where errors are (code, *args) tuples
+    """
+    errors = []
+    
+    # Check version
+    expected_version = _VERSION_MAP.get(cwr_version)
+    if expected_version is not None and version != expected_version:
+        errors.append((E.BAD_VERSION, cwr_version, version))
+    
+    # Check sender type
+    if sender_type not in _SENDER_TYPES:
+        errors.append((E.BAD_SENDER, sender_type))
+    
+    # Check dates
+    if not _validate_date(creation_date):
+        errors.append((E.BAD_CREATION_DATE, creation_date))
+    
+    if not _validate_date(transmission_date):
+        errors.append((E.BAD_TRANSMISSION_DATE, transmission_date))
+    
+    return not errors, tuple(errors)
+
+
 class CWRValidator:
     """
     Validator for Common Works Registration (CWR) files.
@@ -13,16 +133,41 @@ class CWRValidator:
     versions 2.1 and 2.2.
     """
     
-    def __init__(self, version: str = '2.2'):
+    def __init__(self, version: str = '2.2', workers: Optional[int] = None):
         """
         Initialize the CWR validator.
         
         Args:
             version: CWR version to validate against ('2.1' or '2.2')
+            workers: Number of threads used to validate transactions. If None or 1,
+                     transactions are validated in the calling thread.
         """
         self.version = version
-        self.errors = []
-        self.warnings = []
+        self.workers = workers
+        self.errors: Deque[Tuple[Any, ...]] = deque()
+        self.warnings: Deque[str] = deque()
+    
+    @property
+    def errors_list(self) -> List[Tuple[Any, ...]]:
+        """The validation errors as a list of (code, *args) tuples."""
+        return list(self.errors)
+    
+    def format_errors(self) -> List[str]:
+        """
+        Format the validation errors as messages.
+        
+        Errors are recorded as (code, *args) tuples and only formatted here,
+        so validation does no string formatting of its own.
+        
+        Returns:
+            List of error messages
+        """
+        return [_MSGS[code].format(*args) for code, *args in self.errors]
+    
+    @property
+    def warnings_list(self) -> List[str]:
+        """The validation warnings as a list."""
+        return list(self.warnings)
         
     def validate(self, cwr_data: Dict[str, Any]) -> bool:
         """
@@ -34,84 +179,83 @@ class CWRValidator:
         Returns:
             True if the CWR file is valid, False otherwise
         """
-        self.errors = []
-        self.warnings = []
+        self.errors = deque()
+        self.warnings = deque()
+        
+        # Look up each component once and share it between the checks
+        header = cwr_data.get('header', _MISSING)
+        group_header = cwr_data.get('group_header', _MISSING)
+        transactions = cwr_data.get('transactions', _MISSING)
+        trailer = cwr_data.get('trailer', _MISSING)
         
         # Validate file structure
-        valid_structure = self._validate_structure(cwr_data)
+        valid_structure = self._check_structure(header, group_header, transactions, trailer)
+        
+        # Missing components are validated as empty records
+        transactions = _present(transactions, [])
         
         # Validate header
-        valid_header = self._validate_header(cwr_data.get('header', {}))
+        valid_header = self._validate_header(_present(header, {}))
         
         # Validate group header
-        valid_group_header = self._validate_group_header(cwr_data.get('group_header', {}))
+        valid_group_header = self._validate_group_header(_present(group_header, {}))
         
         # Validate transactions
-        valid_transactions = self._validate_transactions(cwr_data.get('transactions', []))
+        valid_transactions = self._validate_transactions(transactions)
         
         # Validate trailer
-        valid_trailer = self._validate_trailer(cwr_data.get('trailer', {}), cwr_data)
+        valid_trailer = self._validate_trailer(_present(trailer, {}), transactions)
         
         # Return overall validity
         return valid_structure and valid_header and valid_group_header and valid_transactions and valid_trailer
     
     def _validate_structure(self, cwr_data: Dict[str, Any]) -> bool:
         """Validate the overall structure of a CWR file."""
+        return self._check_structure(
+            cwr_data.get('header', _MISSING),
+            cwr_data.get('group_header', _MISSING),
+            cwr_data.get('transactions', _MISSING),
+            cwr_data.get('trailer', _MISSING),
+        )
+    
+    def _check_structure(self, header: Any, group_header: Any, transactions: Any, trailer: Any) -> bool:
+        """Check that the components of a CWR file are present, given each one or _MISSING."""
         valid = True
         
         # Check required components
-        if 'header' not in cwr_data:
-            self.errors.append("Missing HDR record")
+        if header is _MISSING:
+            self.errors.append((E.MISSING_HDR,))
             valid = False
-            
-        if 'group_header' not in cwr_data:
-            self.errors.append("Missing GRH record")
+        
+        if group_header is _MISSING:
+            self.errors.append((E.MISSING_GRH,))
             valid = False
-            
-        if 'trailer' not in cwr_data:
-            self.errors.append("Missing TRL record")
+        
+        if trailer is _MISSING:
+            self.errors.append((E.MISSING_TRL,))
             valid = False
-            
-        if 'transactions' not in cwr_data or not cwr_data['transactions']:
-            self.errors.append("No transactions found in CWR file")
+        
+        if transactions is _MISSING or not transactions:
+            self.errors.append((E.NO_TRANSACTIONS,))
             valid = False
-            
+        
         return valid
     
     def _validate_header(self, header: Dict[str, Any]) -> bool:
         """Validate the HDR (header) record."""
-        valid = True
-        
         # Check record type
         if header.get('record_type') != 'HDR':
-            self.errors.append("Invalid or missing HDR record")
+            self.errors.append((E.BAD_HDR,))
             return False
         
-        # Check version
-        version = header.get('version', '')
-        if self.version == '2.1' and version != '01.10':
-            self.errors.append(f"Invalid version for CWR 2.1: {version}")
-            valid = False
-        elif self.version == '2.2' and version != '02.20':
-            self.errors.append(f"Invalid version for CWR 2.2: {version}")
-            valid = False
-        
-        # Check sender type
-        sender_type = header.get('sender_type', '')
-        if sender_type not in ('PB', 'SO', 'WR', 'AA'):
-            self.errors.append(f"Invalid sender type: {sender_type}")
-            valid = False
-        
-        # Check dates
-        creation_date = header.get('creation_date', '')
-        if not self._validate_date(creation_date):
-            self.errors.append(f"Invalid creation date: {creation_date}")
-            valid = False
-            
-        transmission_date = header.get('transmission_date', '')
-        if not self._validate_date(transmission_date):
-            self.errors.append(f"Invalid transmission date: {transmission_date}")
-            valid = False
+        valid, errors = _header_decision(
+            self.version,
+            header.get('version', ''),
+            header.get('sender_type', ''),
+            header.get('creation_date', ''),
+            header.get('transmission_date', ''),
+        )
+        self.errors.extend(errors)
         
         return valid
     
@@ -121,22 +265,20 @@ class CWRValidator:
         
         # Check record type
         if group_header.get('record_type') != 'GRH':
-            self.errors.append("Invalid or missing GRH record")
+            self.errors.append((E.BAD_GRH,))
             return False
         
         # Check transaction type
         transaction_type = group_header.get('transaction_type', '')
-        if transaction_type not in ('NWR', 'REV', 'ACK', 'ISW', 'ISR', 'EXC'):
-            self.errors.append(f"Invalid transaction type in GRH: {transaction_type}")
+        if transaction_type not in _GRH_TX_TYPES:
+            self.errors.append((E.BAD_GRH_TX_TYPE, transaction_type))
             valid = False
         
         # Check version
         version = group_header.get('version', '')
-        if self.version == '2.1' and version != '01.10':
-            self.errors.append(f"Invalid version in GRH for CWR 2.1: {version}")
-            valid = False
-        elif self.version == '2.2' and version != '02.20':
-            self.errors.append(f"Invalid version in GRH for CWR 2.2: {version}")
+        expected_version = _VERSION_MAP.get(self.version)
+        if expected_version is not None and version != expected_version:
+            self.errors.append((E.BAD_GRH_VERSION, self.version, version))
             valid = False
         
         return valid
@@ -145,115 +287,106 @@ class CWRValidator:
         """Validate all transactions in the CWR file."""
         valid = True
         
-        for i, transaction in enumerate(transactions):
-            if not self._validate_transaction(transaction):
-                self.errors.append(f"Invalid transaction at index {i}")
+        # Transactions are validated independently, so they can be checked in
+        # parallel and their errors merged back in order afterwards
+        if self.workers and self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(self._validate_transaction_pure, transactions))
+        else:
+            results = map(self._validate_transaction_pure, transactions)
+        
+        for i, (transaction_valid, errors) in enumerate(results):
+            self.errors.extend(errors)
+            if not transaction_valid:
+                self.errors.append((E.BAD_TRANSACTION, i))
                 valid = False
         
         return valid
     
-    def _validate_transaction(self, transaction: Dict[str, Any]) -> bool:
-        """Validate a single transaction in the CWR file."""
+    def _validate_transaction_pure(self, transaction: Dict[str, Any]) -> Tuple[bool, List[Tuple[Any, ...]]]:
+        """
+        Validate a single transaction without modifying the validator.
+        
+        Returns:
+            Tuple of (valid, errors), where errors are (code, *args) tuples
+        """
         valid = True
+        errors = []
         
-        transaction_type = transaction.get('transaction_type', '')
-        records = transaction.get('records', [])
+        try:
+            transaction_type = transaction['transaction_type']
+            records = transaction['records']
+        except KeyError:
+            transaction_type = transaction.get('transaction_type', '')
+            records = transaction.get('records', [])
         
         # Check transaction type
-        if transaction_type not in ('WRK', 'REV', 'ACK', 'ISW', 'ISR', 'EXC', 'NWR'):
-            self.errors.append(f"Invalid transaction type: {transaction_type}")
+        if transaction_type not in _TX_TYPES:
+            errors.append((E.BAD_TX_TYPE, transaction_type))
             valid = False
         
         # Check record types and sequence
         if not records:
-            self.errors.append("Transaction contains no records")
+            errors.append((E.EMPTY_TRANSACTION,))
             valid = False
         elif records[0].get('record_type') != transaction_type:
-            self.errors.append(f"Transaction header record type does not match transaction type")
+            errors.append((E.TX_HEADER_MISMATCH,))
             valid = False
         
         # Validate specific transaction types
-        if transaction_type == 'NWR':
-            valid = valid and self._validate_nwr_transaction(records)
-        elif transaction_type == 'REV':
-            valid = valid and self._validate_rev_transaction(records)
-        
-        return valid
-    
-    def _validate_nwr_transaction(self, records: List[Dict[str, Any]]) -> bool:
-        """Validate a NWR (New Work Registration) transaction."""
-        valid = True
-        
-        # Check for required record types
-        record_types = [record.get('record_type') for record in records]
-        
-        # NWR must have at least one SWT record
-        if 'SWT' not in record_types:
-            self.errors.append("NWR transaction missing SWT record")
-            valid = False
-        
-        # NWR must have at least one SWR record
-        if 'SWR' not in record_types:
-            self.errors.append("NWR transaction missing SWR record")
-            valid = False
+        if transaction_type in _NWR_LIKE_TX_TYPES:
+            valid = valid and self._validate_nwr_like(records, transaction_type, errors)
         
-        return valid
+        return valid, errors
     
-    def _validate_rev_transaction(self, records: List[Dict[str, Any]]) -> bool:
-        """Validate a REV (Revised Registration) transaction."""
+    def _validate_nwr_like(self, records: List[Dict[str, Any]], transaction_type: str,
+                           errors: List[Tuple[Any, ...]]) -> bool:
+        """Validate a NWR (New Work Registration) or REV (Revised Registration) transaction."""
         valid = True
         
-        # Check for required record types
-        record_types = [record.get('record_type') for record in records]
-        
-        # REV must have at least one SWT record
-        if 'SWT' not in record_types:
-            self.errors.append("REV transaction missing SWT record")
+        # Check for required record types in a single pass
+        has_swt = has_swr = False
+        try:
+            for record in records:
+                record_type = record['record_type']
+                if record_type == 'SWT':
+                    has_swt = True
+                elif record_type == 'SWR':
+                    has_swr = True
+                if has_swt and has_swr:
+                    break
+        except KeyError:
+            # Some record has no record type, so check them all again with get()
+            record_types = {record.get('record_type') for record in records}
+            has_swt = 'SWT' in record_types
+            has_swr = 'SWR' in record_types
+        
+        # NWR and REV must have at least one SWT record
+        if not has_swt:
+            errors.append((E.MISSING_SWT, transaction_type))
             valid = False
         
-        # REV must have at least one SWR record
-        if 'SWR' not in record_types:
-            self.errors.append("REV transaction missing SWR record")
+        # NWR and REV must have at least one SWR record
+        if not has_swr:
+            errors.append((E.MISSING_SWR, transaction_type))
             valid = False
         
         return valid
     
-    def _validate_trailer(self, trailer: Dict[str, Any], cwr_data: Dict[str, Any]) -> bool:
+    def _validate_trailer(self, trailer: Dict[str, Any], transactions: List[Dict[str, Any]]) -> bool:
         """Validate the TRL (trailer) record."""
         valid = True
         
         # Check record type
         if trailer.get('record_type') != 'TRL':
-            self.errors.append("Invalid or missing TRL record")
+            self.errors.append((E.BAD_TRL,))
             return False
         
         # Check counts
         transaction_count = trailer.get('transaction_count', 0)
-        actual_transaction_count = len(cwr_data.get('transactions', []))
+        actual_transaction_count = len(transactions)
         if transaction_count != actual_transaction_count:
-            self.errors.append(f"Transaction count mismatch: {transaction_count} in TRL, {actual_transaction_count} actual")
+            self.errors.append((E.TX_COUNT_MISMATCH, transaction_count, actual_transaction_count))
             valid = False
         
-        return valid
-    
-    def _validate_date(self, date_str: str) -> bool:
-        """Validate a date string in YYYYMMDD format."""
-        if not date_str or len(date_str) != 8:
-            return False
-        
-        try:
-            year = int(date_str[0:4])
-            month = int(date_str[4:6])
-            day = int(date_str[6:8])
-            
-            # Basic validation
-            if year < 1900 or year > 2100:
-                return False
-            if month < 1 or month > 12:
-                return False
-            if day < 1 or day > 31:
-                return False
-                
-            return True
-        except ValueError:
-            return False 
\ No newline at end of file
+        return valid 
\ No newline at end of file
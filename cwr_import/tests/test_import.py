@@ -1,9 +1,20 @@
 """
 Test script for the CWR import module.
 """
+import io
+import json
 import os
+import shutil
+import tempfile
 import unittest
+from src.cwr_parser import CWRParser
 from src.main import CWRImport
+from src.lookup.lookup_manager import LookupManager
+from src.models.records import (
+    AlternativeTitleRecord, CWRFile, CWRTransaction, GroupHeaderRecord, HeaderRecord,
+    TrailerRecord, WorkRegistrationRecord,
+)
+from src.validator.validator import CWRValidator
 
 
 class TestCWRImport(unittest.TestCase):
@@ -49,6 +60,204 @@ class TestCWRImport(unittest.TestCase):
         self.assertIn('is_valid', result)
         self.assertIn('validation_errors', result)
         self.assertIn('validation_warnings', result)
+    
+    def test_write_json_matches_to_json(self):
+        """Test that streaming JSON output parses to the same data as to_json."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        output_file = os.path.join(temp_dir, 'output.json')
+        
+        result = self.cwr_import.parse_file(self.sample_file, validate=True)
+        for transactions in (result['transactions'] * 2, []):
+            cwr_data = dict(result, transactions=transactions)
+            CWRImport.write_json(cwr_data, output_file)
+            
+            with open(output_file, 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f), json.loads(CWRImport.to_json(cwr_data)))
+
+
+class TestCWRParser(unittest.TestCase):
+    """Test case for the CWR parser."""
+    
+    def setUp(self):
+        """Set up a temporary directory for generated CWR files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+    
+    def test_parallel_parse_file_matches_serial(self):
+        """Test that parsing a large file in worker processes gives the same result."""
+        lines = ['HDR02.2PB000000123TEST PUBLISHER', 'GRHNWR0000102.20']
+        for i in range(400):
+            lines += [f'NWR{i:08d}', f'SWR{i:08d}', f'SWT{i:08d}']
+        lines.append('TRL000010040001202')
+        
+        file_path = os.path.join(self.temp_dir, 'large.txt')
+        with open(file_path, 'w', encoding='latin-1', newline='') as f:
+            f.write('\r\n'.join(lines) + '\r\n')
+        
+        serial = CWRParser().parse_file(file_path)
+        parallel = CWRParser(workers=2).parse_file(file_path)
+        self.assertEqual(len(parallel['transactions']), 400)
+        self.assertEqual(parallel, serial)
+    
+    @unittest.skipUnless(os.path.isdir('/dev/fd'), "requires /dev/fd")
+    def test_parse_file_from_pipe(self):
+        """Test that a file that cannot be memory-mapped, such as a pipe, is parsed from its lines."""
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(write_fd, 'wb') as f:
+            f.write(b'HDR02.2PB00123TEST\r\nGRHNWR\r\nNWR00000001\r\nSWR00000001\r\nTRL00001\r\n')
+        
+        try:
+            result = CWRParser().parse_file(f'/dev/fd/{read_fd}')
+        finally:
+            os.close(read_fd)
+        
+        self.assertEqual(result['header']['sender_name'], 'TEST')
+        self.assertEqual([record.record_type for record in result['transactions'][0]['records']], ['NWR', 'SWR'])
+        self.assertEqual(result['trailer']['record_type'], 'TRL')
+    
+    def test_parse_text_outside_latin1(self):
+        """Test that text streams may contain characters that latin-1 cannot encode."""
+        result = CWRParser().parse(io.StringIO('HDR02.2PB00123ŁÓDŹ\nGRHNWR\nNWRŻÓŁW\nTRL00001'))
+        
+        self.assertEqual(result['header']['sender_name'], 'ŁÓDŹ')
+        self.assertEqual(result['transactions'][0]['records'][0].raw_data, 'NWRŻÓŁW')
+
+
+class TestLookupManager(unittest.TestCase):
+    """Test case for the lookup table manager."""
+    
+    def setUp(self):
+        """Set up a temporary tables directory with one table."""
+        self.tables_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tables_dir)
+        
+        with open(os.path.join(self.tables_dir, 'AgreementType.csv'), 'w', encoding='utf-8') as f:
+            f.write('CODE;DEFINITION\nOS;Original Specific\nPS;Sub-publishing Specific\n')
+    
+    def test_load_table_is_cached(self):
+        """Test that a loaded table is pickled and reused."""
+        table = LookupManager(self.tables_dir).load_table('AgreementType')
+        self.assertTrue(os.path.exists(os.path.join(self.tables_dir, 'AgreementType.pkl')))
+        
+        cached = LookupManager(self.tables_dir).load_table('AgreementType')
+        self.assertEqual(list(cached), list(table))
+    
+    def test_blank_lines_are_skipped(self):
+        """Test that blank lines in a table file do not become rows."""
+        with open(os.path.join(self.tables_dir, 'TitleType.csv'), 'w', encoding='utf-8') as f:
+            f.write('CODE;DEFINITION\n\nAT;Alternative Title\n\n')
+        
+        table = LookupManager(self.tables_dir).get_table('TitleType')
+        self.assertEqual(list(table), [{'CODE': 'AT', 'DEFINITION': 'Alternative Title'}])
+    
+    def test_unreadable_cache_is_ignored(self):
+        """Test that a corrupt or foreign pickle is treated as a cache miss."""
+        cache_path = os.path.join(self.tables_dir, 'AgreementType.pkl')
+        
+        # A pickle of a class from a module that cannot be imported, then a truncated file
+        foreign = b'cmissing_module\nLookupTable\n.'
+        for contents in (foreign, b'\x80\x04\x95'):
+            with open(cache_path, 'wb') as f:
+                f.write(contents)
+            
+            table = LookupManager(self.tables_dir).load_table('AgreementType')
+            self.assertEqual(table[0], {'CODE': 'OS', 'DEFINITION': 'Original Specific'})
+    
+    def test_extract_all_lookup_tables(self):
+        """Test extracting every table from a combined lookup CSV, including a table split over two blocks."""
+        source_file = os.path.join(self.tables_dir, 'lookup.csv')
+        with open(source_file, 'w', encoding='utf-8') as f:
+            f.write('TABLE_NAME;CODE;DEFINITION\n'
+                    'TitleType;AT;Alternative Title\n'
+                    ';OT;Original Title\n'
+                    'WriterRole;CA;Composer Author\n'
+                    'TitleType;TE;First Line of Text\n')
+        
+        lookup_manager = LookupManager(self.tables_dir)
+        self.assertEqual(lookup_manager.extract_all_lookup_tables(source_file), ['TitleType', 'WriterRole'])
+        
+        self.assertEqual([row['CODE'] for row in lookup_manager.get_table('TitleType')], ['AT', 'OT', 'TE'])
+        self.assertEqual(list(lookup_manager.get_table('WriterRole')), [{'CODE': 'CA', 'DEFINITION': 'Composer Author'}])
+    
+    def test_lookup(self):
+        """Test looking up and validating codes."""
+        lookup_manager = LookupManager(self.tables_dir)
+        
+        self.assertEqual(lookup_manager.lookup('AgreementType', 'CODE', 'PS', 'DEFINITION'), 'Sub-publishing Specific')
+        self.assertEqual(lookup_manager.lookup('AgreementType', 'CODE', 'OS')['DEFINITION'], 'Original Specific')
+        self.assertIsNone(lookup_manager.lookup('AgreementType', 'CODE', 'XX'))
+        self.assertTrue(lookup_manager.is_valid('AgreementType', 'CODE', 'OS'))
+        self.assertFalse(lookup_manager.is_valid('AgreementType', 'CODE', 'XX'))
+
+
+class TestCWRFile(unittest.TestCase):
+    """Test case for the CWR record models."""
+    
+    def test_write_json_matches_to_dict(self):
+        """Test that streaming a CWR file as JSON gives the same output as dumping to_dict()."""
+        cwr_file = CWRFile(
+            header=HeaderRecord(sender_type='PB', sender_id='000000123', sender_name='TEST PUBLISHER'),
+            group_header=GroupHeaderRecord(transaction_type='NWR', group_id='00001'),
+            transactions=[
+                CWRTransaction('NWR', 0, WorkRegistrationRecord(title='FIRST WORK'),
+                               [AlternativeTitleRecord(title='ÉTUDE', title_type='AT')]),
+                CWRTransaction('NWR', 1, WorkRegistrationRecord(title='SECOND WORK', duration=180)),
+            ],
+            group_trailer=None,
+            trailer=TrailerRecord(group_count=1, transaction_count=2),
+        )
+        
+        expected = io.StringIO()
+        json.dump(cwr_file.to_dict(), expected)
+        output = io.StringIO()
+        cwr_file.write_json(output)
+        
+        self.assertEqual(output.getvalue(), expected.getvalue())
+
+
+class TestCWRValidator(unittest.TestCase):
+    """Test case for the CWR validator."""
+    
+    def make_cwr_data(self, *record_types):
+        """Build parsed CWR data with one NWR transaction made of the given records."""
+        return {
+            'header': {'record_type': 'HDR', 'version': '02.20', 'sender_type': 'PB',
+                       'creation_date': '20240101', 'transmission_date': '20240102'},
+            'group_header': {'record_type': 'GRH', 'transaction_type': 'NWR', 'version': '02.20'},
+            'transactions': [{
+                'transaction_type': 'NWR',
+                'records': [{'record_type': record_type} for record_type in ('NWR',) + record_types],
+            }],
+            'trailer': {'record_type': 'TRL', 'transaction_count': 1},
+        }
+    
+    def test_valid_nwr_transaction(self):
+        """Test that a complete NWR transaction is valid."""
+        validator = CWRValidator('2.2')
+        self.assertTrue(validator.validate(self.make_cwr_data('SWR', 'SWT')))
+        self.assertEqual(list(validator.errors), [])
+    
+    def test_nwr_transaction_missing_writer_records(self):
+        """Test that an NWR transaction without SWR and SWT records is invalid."""
+        validator = CWRValidator('2.2')
+        self.assertFalse(validator.validate(self.make_cwr_data('ALT')))
+        self.assertEqual(validator.format_errors(), [
+            "NWR transaction missing SWT record",
+            "NWR transaction missing SWR record",
+            "Invalid transaction at index 0",
+        ])
+    
+    def test_parallel_validation_matches_serial(self):
+        """Test that validating transactions in threads reports the same errors in order."""
+        cwr_data = self.make_cwr_data('ALT')
+        cwr_data['transactions'] *= 50
+        cwr_data['trailer']['transaction_count'] = 50
+        
+        serial = CWRValidator('2.2')
+        parallel = CWRValidator('2.2', workers=4)
+        self.assertEqual(serial.validate(cwr_data), parallel.validate(cwr_data))
+        self.assertEqual(serial.format_errors(), parallel.format_errors())
 
 
 if __name__ == '__main__':